@@ -1,193 +1,284 @@
 import logging
+from bisect import bisect_left, bisect_right
 from node import Node
-from util import compare_keys, validate_entry, log_action
+from util import validate_entry, log_action
+
+logger = logging.getLogger(__name__)
 
 class BplusTree:
     def __init__(self, order):
         # Initialize the B+ Tree
-        self.root = Node(True, order)  # Root node is initially a leaf
-        self.order = order  # Max number of children per node
+        self.order = order  # Minimum degree; nodes hold at most 2 * order - 1 keys
+        self.max_keys = (2 * order) - 1  # Capacity of a single node
+        self.root = Node(self.max_keys, leaf=True)  # Root node is initially a leaf
+        self.leftmost_leaf = self.root  # Head of the leaf chain for ordered scans
         self.height = 1  # Initial tree height
-        logging.basicConfig(level=logging.INFO)  # Configure logging
+        self._struct_version = 0  # Bumped on every successful mutation
+        self._struct_cache = None  # Last rendered structure and its version
         log_action("Initialized B+ Tree with order", order)
 
-    def insert(self, key, value):
-        # Insert a key-value pair into the B+ Tree
-        is_valid, message = validate_entry(key, value)
-        if not is_valid:
-            logging.error(f"Invalid key-value pair: {message}")
-            raise ValueError("Invalid key-value pair.")
-
-        if len(self.root.keys) == (2 * self.order) - 1:  # Root is full
-            new_root = Node(False, self.order)
-            new_root.children.insert(0, self.root)
-            self.split_child(new_root, 0)
-            self.root = new_root
-            self.height += 1
-            log_action("Root node split; tree height increased.")
-
-        self._insert_non_full(self.root, key, value)
-
-    def _insert_non_full(self, node, key, value):
-        # Helper function to insert into a non-full node
-        i = len(node.keys) - 1
-        if node.leaf:
-            while i >= 0 and compare_keys(key, node.keys[i][0]) < 0:
-                i -= 1
-            if i >= 0 and compare_keys(key, node.keys[i][0]) == 0:
-                # Handle duplicates or equal keys if necessary (optional behavior)
-                logging.warning(f"Key {key} already exists. Overwriting value.")
-                node.keys[i] = (key, value)
-            else:
-                node.keys.insert(i + 1, (key, value))
-        else:
-            while i >= 0 and compare_keys(key, node.keys[i]) < 0:
-                i -= 1
-            i += 1
-            if len(node.children[i].keys) == (2 * self.order) - 1:
-                self.split_child(node, i)
-                if compare_keys(key, node.keys[i]) > 0:
-                    i += 1
-            self._insert_non_full(node.children[i], key, value)
+    def insert(self, key, value, skip_validate=False):
+        # Insert a key-value pair into the B+ Tree; callers that pre-validated may skip the check
+        if not skip_validate:
+            is_valid, message = validate_entry(key, value)
+            if not is_valid:
+                logger.error("Invalid key-value pair: %s", message)
+                raise ValueError("Invalid key-value pair.")
 
-    def split_child(self, parent, index):
-        # Split a child node of a given parent at a specified index
-        full_child = parent.children[index]
-        new_node = Node(full_child.leaf, self.order)
-        mid = self.order - 1
-
-        parent.keys.insert(index, full_child.keys[mid][0] if full_child.leaf else full_child.keys[mid])
-        new_node.keys = full_child.keys[mid + 1:]
-        full_child.keys = full_child.keys[:mid]
-
-        if not full_child.leaf:
-            new_node.children = full_child.children[self.order:]
-            full_child.children = full_child.children[:self.order]
-        else:
-            new_node.next = full_child.next
-            full_child.next = new_node
+        leaf, path = self._find_leaf(key)
+        if not leaf.insert_in_leaf(key, value):
+            logger.warning("Key %s already exists. Overwriting value.", key)
+        if len(leaf.keys) > self.max_keys:
+            self._handle_overflow(leaf, path)
+        self._struct_version += 1
+
+    def _find_leaf(self, key):
+        # Descend from the root to the leaf responsible for key
+        node = self.root
+        path = []  # (parent, child index) pairs from the top down
+        while not node.leaf:
+            # Separators are copies of the first key of the right subtree
+            i = bisect_right(node.keys, key)
+            path.append((node, i))
+            node = node.children[i]
+        return node, path
+
+    def _handle_overflow(self, node, path):
+        # Split overfull nodes in place, walking up the descent path until a parent has room
+        while len(node.keys) > self.max_keys:
+            if not path:
+                # Only splitting the root adds a level to the tree
+                new_root = Node(self.max_keys, leaf=False)
+                new_root.children.insert(0, node)
+                node.parent = new_root
+                self.split_child(new_root, 0)
+                self.root = new_root
+                self.height += 1
+                log_action("Root node split; tree height increased.")
+                return
 
+            parent, index = path.pop()
+            self.split_child(parent, index)
+            node = parent
+
+    def split_child(self, parent, index):
+        # Split an overfull child node of a given parent at a specified index
+        new_node, separator = parent.children[index].split()
+        parent.keys.insert(index, separator)
         parent.children.insert(index + 1, new_node)
         log_action("Split child node at index", index)
 
+    def clear(self):
+        # Drop every entry and start over with an empty leaf root
+        self.root = Node(self.max_keys, leaf=True)
+        self.leftmost_leaf = self.root
+        self.height = 1
+        self._struct_version += 1
+        log_action("Cleared B+ Tree")
+
+    def bulk_load(self, sorted_pairs):
+        # Build the tree bottom-up from pairs sorted by unique key; the tree must be empty
+        if self.root.keys or not self.root.leaf:
+            raise ValueError("Bulk load requires an empty tree.")
+        keys = [key for key, _ in sorted_pairs]
+        values = [value for _, value in sorted_pairs]
+        if not keys:
+            return
+
+        # Pack the leaves left to right and link them
+        level = []
+        start = 0
+        for size in self._chunk_sizes(len(keys), self.max_keys, self.order - 1):
+            leaf = Node(self.max_keys, leaf=True)
+            leaf.keys = keys[start:start + size]
+            leaf.values = values[start:start + size]
+            if level:
+                level[-1].next = leaf
+            level.append(leaf)
+            start += size
+        lows = [leaf.keys[0] for leaf in level]
+        self.height = 1
+
+        # Build internal levels using the lowest key of each subtree as separator
+        while len(level) > 1:
+            parents, parent_lows = [], []
+            start = 0
+            for size in self._chunk_sizes(len(level), self.max_keys + 1, self.order):
+                node = Node(self.max_keys, leaf=False)
+                node.children = level[start:start + size]
+                node.keys = lows[start + 1:start + size]
+                for child in node.children:
+                    child.parent = node
+                parents.append(node)
+                parent_lows.append(lows[start])
+                start += size
+            level, lows = parents, parent_lows
+            self.height += 1
+
+        self.root = level[0]
+        self.leftmost_leaf = level[0]
+        while not self.leftmost_leaf.leaf:
+            self.leftmost_leaf = self.leftmost_leaf.children[0]
+        self._struct_version += 1
+        log_action("Bulk loaded entries", len(keys))
+
+    def _chunk_sizes(self, total, capacity, minimum):
+        # Spread total items over the fewest runs of at most capacity items
+        count = -(-total // capacity)
+        base, extra = divmod(total, count)
+        # Even runs never drop below minimum unless everything fits in one node
+        assert count == 1 or base >= minimum, "bulk load chunk below minimum fill"
+        return [base + 1] * extra + [base] * (count - extra)
+
     def search(self, key):
         # Search for a key in the B+ Tree
-        result = self._search(self.root, key)
+        result = self.root.search(key)
         if result is None:
             log_action("Search failed; key not found", key)
         else:
             log_action("Search successful; found key", key)
         return result
 
-    def _search(self, node, key):
-        # Helper function for searching within a node
-        i = 0
-        while i < len(node.keys) and compare_keys(key, node.keys[i][0] if node.leaf else node.keys[i]) > 0:
-            i += 1
+    def search_many(self, keys):
+        # Look up several keys in one call, sharing one descent among keys in the same leaf
+        results = [None] * len(keys)
+        leaf = None
+        # Visit keys in sorted order; results still line up with the input order
+        for i in sorted(range(len(keys)), key=keys.__getitem__):
+            key = keys[i]
+            if leaf is None or (leaf.next is not None and key >= leaf.next.keys[0]):
+                leaf = self.root.find_leaf(key)
+            idx = bisect_left(leaf.keys, key)
+            if idx < len(leaf.keys) and leaf.keys[idx] == key:
+                results[i] = leaf.values[idx]
+        log_action("Batch search completed for keys", len(results))
+        return results
 
-        if node.leaf:
-            return next((v for k, v in node.keys if k == key), None)
-        return self._search(node.children[i], key)
+    def range_query(self, start_key, end_key):
+        # Return key-value pairs in [start_key, end_key] with one descent and a leaf chain walk
+        return self.root.range_query(start_key, end_key)
 
     def delete(self, key):
         # Delete a key from the B+ Tree
-        self._delete(self.root, key)
+        self._delete(key)
         if not self.root.keys and not self.root.leaf:
             self.root = self.root.children[0]
+            self.root.parent = None
             self.height -= 1
-            logging.info("Reduced tree height after root collapse.")
+            logger.info("Reduced tree height after root collapse.")
 
-    def _delete(self, node, key):
+    def _delete(self, key):
         # Helper function for deletion
-        i = 0
-        while i < len(node.keys) and compare_keys(key, node.keys[i][0] if node.leaf else node.keys[i]) > 0:
-            i += 1
-
-        if node.leaf:
-            if i < len(node.keys) and node.keys[i][0] == key:
-                node.keys.pop(i)
-                log_action("Deleted key", key)
-            else:
-                logging.warning(f"Key {key} not found in leaf.")
+        node, path = self._find_leaf(key)
+        i = bisect_left(node.keys, key)
+        if i >= len(node.keys) or node.keys[i] != key:
+            logger.warning("Key %s not found in leaf.", key)
+            return
+        node.keys.pop(i)
+        node.values.pop(i)
+        self._struct_version += 1
+        log_action("Deleted key", key)
+
+        # Walk back up, stopping at the first level that is still full enough
+        for parent, index in reversed(path):
+            if len(parent.children[index].keys) >= self.order - 1:
+                break
+            self._fix_underflow(parent, index)
+
+    def _fix_underflow(self, parent, index):
+        # Restore the minimum fill of a child by borrowing or merging
+        # The right sibling is tried first so the common case touches one sibling
+        min_keys = self.order - 1
+        has_right = index < len(parent.children) - 1
+        if has_right and len(parent.children[index + 1].keys) > min_keys:
+            self.borrow_from_right(parent, index)
+        elif index > 0 and len(parent.children[index - 1].keys) > min_keys:
+            self.borrow_from_left(parent, index)
+        elif has_right:
+            self._merge_children(parent, index)
         else:
-            if i < len(node.keys) and node.keys[i] == key:
-                self._delete_internal_node(node, i)
-            else:
-                self._delete(node.children[i], key)
-
-    def _delete_internal_node(self, node, index):
-        # Delete a key from an internal node
-        if len(node.children[index].keys) >= self.order:
-            predecessor = self._get_predecessor(node, index)
-            node.keys[index] = predecessor
-            self._delete(node.children[index], predecessor)
-        elif len(node.children[index + 1].keys) >= self.order:
-            successor = self._get_successor(node, index)
-            node.keys[index] = successor
-            self._delete(node.children[index + 1], successor)
+            self._merge_children(parent, index - 1)
+
+    def borrow_from_left(self, parent, index):
+        # Move the last entry of the left sibling into the child
+        child = parent.children[index]
+        sibling = parent.children[index - 1]
+        if child.leaf:
+            child.keys.insert(0, sibling.keys.pop())
+            child.values.insert(0, sibling.values.pop())
+            parent.keys[index - 1] = child.keys[0]
         else:
-            self._merge_children(node, index)
-            self._delete(node.children[index], node.keys[index])
-
-    def _get_predecessor(self, node, index):
-        # Get predecessor key
-        curr = node.children[index]
-        while not curr.leaf:
-            curr = curr.children[-1]
-        return curr.keys[-1][0]
-
-    def _get_successor(self, node, index):
-        # Get successor key
-        curr = node.children[index + 1]
-        while not curr.leaf:
-            curr = curr.children[0]
-        return curr.keys[0][0]
+            child.keys.insert(0, parent.keys[index - 1])
+            parent.keys[index - 1] = sibling.keys.pop()
+            moved = sibling.children.pop()
+            moved.parent = child
+            child.children.insert(0, moved)
+        log_action("Borrowed from left sibling at index", index)
+
+    def borrow_from_right(self, parent, index):
+        # Move the first entry of the right sibling into the child
+        child = parent.children[index]
+        sibling = parent.children[index + 1]
+        if child.leaf:
+            child.keys.append(sibling.keys.pop(0))
+            child.values.append(sibling.values.pop(0))
+            parent.keys[index] = sibling.keys[0]
+        else:
+            child.keys.append(parent.keys[index])
+            parent.keys[index] = sibling.keys.pop(0)
+            moved = sibling.children.pop(0)
+            moved.parent = child
+            child.children.append(moved)
+        log_action("Borrowed from right sibling at index", index)
 
     def _merge_children(self, node, index):
         # Merge two child nodes
         left_child = node.children[index]
         right_child = node.children[index + 1]
 
-        if not left_child.leaf:
+        if left_child.leaf:
+            left_child.keys.extend(right_child.keys)
+            left_child.values.extend(right_child.values)
+            left_child.next = right_child.next
+        else:
             left_child.keys.append(node.keys[index])
-        left_child.keys.extend(right_child.keys)
-        left_child.children.extend(right_child.children)
+            left_child.keys.extend(right_child.keys)
+            for child in right_child.children:
+                child.parent = left_child
+            left_child.children.extend(right_child.children)
 
         node.keys.pop(index)
         node.children.pop(index + 1)
         log_action("Merged children at index", index)
 
+    def iter_sorted(self):
+        # Yield (key, value) pairs in key order by walking the leaf chain lazily
+        node = self.leftmost_leaf
+        while node:
+            yield from zip(node.keys, node.values)
+            node = node.next
+
     def get_sorted_data(self):
-        # Retrieve sorted data from the B+ Tree
-        sorted_data = []
-        self._in_order_traversal(self.root, sorted_data)
-        return sorted_data
-
-    def _in_order_traversal(self, node, sorted_data):
-        # Optimized in-order traversal
-        if node.leaf:
-            current = node
-            while current:
-                sorted_data.extend(current.keys)
-                current = current.next
-        else:
-            for i in range(len(node.children)):
-                self._in_order_traversal(node.children[i], sorted_data)
-                if i < len(node.keys):
-                    sorted_data.append((node.keys[i], ""))
+        # Retrieve sorted data from the B+ Tree as a list
+        return list(self.iter_sorted())
 
     def get_tree_structure(self):
-        # Retrieve the structure of the B+ Tree
+        # Retrieve the structure of the B+ Tree, reusing it while the tree is unchanged
+        if self._struct_cache is not None and self._struct_cache[0] == self._struct_version:
+            return self._struct_cache[1]
         structure = []
         self._print_tree(self.root, 0, structure)
-        return "\n".join(structure)
+        rendered = "\n".join(structure)
+        self._struct_cache = (self._struct_version, rendered)
+        return rendered
 
     def _print_tree(self, node, level, structure):
-        # Print the tree level by level
-        if node.leaf:
-            structure.append(f"Level {level}: Leaf -> {node.keys}")
-        else:
-            structure.append(f"Level {level}: Internal -> {node.keys}")
-            for child in node.children:
-                self._print_tree(child, level + 1, structure)
-
+        # Print the tree depth first using an explicit stack
+        stack = [(node, level)]
+        while stack:
+            node, level = stack.pop()
+            if node.leaf:
+                structure.append(f"Level {level}: Leaf -> {list(zip(node.keys, node.values))}")
+            else:
+                structure.append(f"Level {level}: Internal -> {node.keys}")
+                stack.extend((child, level + 1) for child in reversed(node.children))
@@ -1,66 +1,117 @@
 import logging
 from bPlusTree import BplusTree
 import csv
-from util import validate_entry, backup_data, restore_data, log_action
+from util import validate_entry, backup_data, restore_data, log_action, ReadWriteLock
 
-# Setting up logging for database operations
-logging.basicConfig(filename="db_log.log", level=logging.INFO,
-                    format="%(asctime)s [%(levelname)s] %(message)s", filemode='a')
+logger = logging.getLogger(__name__)
+
+# Wide nodes keep the tree shallow: height grows with log base order
+DEFAULT_ORDER = 32
+# Batches at least this large are bulk loaded into an empty tree
+BULK_LOAD_THRESHOLD = 64
 
 class Database:
-    def __init__(self, order):
+    def __init__(self, order=DEFAULT_ORDER):
         if not isinstance(order, int) or order < 2:
             raise ValueError("Order must be an integer greater than or equal to 2.")
         self.btree = BplusTree(order)
+        self._lock = ReadWriteLock()  # Many readers or one writer at a time
         log_action("Initialized database with B+ Tree of order", order)
 
     def insert(self, key, value):
         try:
             is_valid, message = validate_entry(key, value)
             if is_valid:
-                self.btree.insert(key, value)
+                with self._lock.write_locked():
+                    self.btree.insert(key, value, skip_validate=True)  # Already checked above
                 log_action("Inserted key", key, value)
             else:
-                logging.warning(f"Invalid entry: key={key}, value={value} - {message}")
+                logger.warning("Invalid entry: key=%s, value=%s - %s", key, value, message)
         except Exception as e:
-            logging.error(f"Error during insertion: key={key}, value={value}, error={e}")
+            logger.error("Error during insertion: key=%s, value=%s, error=%s", key, value, e)
 
     def search(self, key):
         try:
             log_action("Searching for key", key)
-            result = self.btree.search(key)
+            with self._lock.read_locked():
+                result = self.btree.search(key)
             if result is None:
-                logging.info(f"Key {key} not found.")
+                logger.info("Key %s not found.", key)
             else:
-                logging.info(f"Found key {key}: {result}")
+                logger.info("Found key %s: %s", key, result)
             return result
         except Exception as e:
-            logging.error(f"Error during search for key={key}: {e}")
+            logger.error("Error during search for key=%s: %s", key, e)
             return None
 
+    def batch_search(self, keys):
+        # Look up many keys under a single read lock; missing keys map to None
+        try:
+            keys = list(keys)  # Materialise once so any iterable can be counted and logged
+            invalid_keys = [key for key in keys if not isinstance(key, int)]
+            if invalid_keys:
+                raise ValueError(f"Keys must be integers: {invalid_keys}")
+            with self._lock.read_locked():
+                return self.btree.search_many(keys)
+        except Exception as e:
+            count = len(keys) if isinstance(keys, list) else "unknown"
+            logger.error("Error during batch search of %s keys: %s", count, e)
+            return []
+
     def batch_insert(self, entries):
         if not isinstance(entries, list):
-            logging.error("Entries must be a list of tuples.")
+            logger.error("Entries must be a list of tuples.")
             return
 
-        valid_entries = [entry for entry in entries if isinstance(entry, tuple) and len(entry) == 2]
-        invalid_entries = [entry for entry in entries if entry not in valid_entries]
+        # Partition and validate the whole batch in one pass so the tree can skip per-key checks
+        checked, invalid_entries = [], []
+        for entry in entries:
+            if not (isinstance(entry, tuple) and len(entry) == 2):
+                invalid_entries.append(entry)
+                continue
+            key, value = entry
+            is_valid, message = validate_entry(key, value)
+            if is_valid:
+                checked.append(entry)
+            else:
+                logger.warning("Invalid entry: key=%s, value=%s - %s", key, value, message)
 
-        for key, value in valid_entries:
-            self.insert(key, value)
+        with self._lock.write_locked():
+            if len(checked) >= BULK_LOAD_THRESHOLD and not self.btree.root.keys:
+                self._bulk_load(checked)
+            else:
+                self._insert_validated(checked)
 
         if invalid_entries:
-            logging.warning(f"Skipped invalid entries: {invalid_entries}")
+            logger.warning("Skipped invalid entries: %s", invalid_entries)
+
+    def _insert_validated(self, entries):
+        # Insert pre-validated entries one by one with a single summary log line
+        try:
+            for key, value in entries:
+                self.btree.insert(key, value, skip_validate=True)
+            log_action("Inserted entries", len(entries))
+        except Exception as e:
+            logger.error("Error during batch insertion of %d entries: %s", len(entries), e)
+
+    def _bulk_load(self, entries):
+        # Sort once and build the tree bottom-up; later duplicates win as with insert
+        latest = dict(entries)
+        try:
+            self.btree.bulk_load(sorted(latest.items()))  # Logs the entry count itself
+        except Exception as e:
+            logger.error("Error during bulk load of %d entries: %s", len(latest), e)
 
     def delete(self, key):
         try:
             log_action("Attempting to delete key", key)
-            self.btree.delete(key)
-            logging.info(f"Key {key} deleted successfully.")
+            with self._lock.write_locked():
+                self.btree.delete(key)
+            logger.info("Key %s deleted successfully.", key)
         except KeyError:
-            logging.warning(f"Key {key} not found in the database.")
+            logger.warning("Key %s not found in the database.", key)
         except Exception as e:
-            logging.error(f"Error during deletion: key={key}, error={e}")
+            logger.error("Error during deletion: key=%s, error=%s", key, e)
 
     def range_search(self, lower_bound, upper_bound):
         try:
@@ -69,73 +120,58 @@ class Database:
             if lower_bound > upper_bound:
                 raise ValueError("Lower bound must not exceed upper bound.")
 
-            result = []
-            node = self.btree.root
-
-            # Traverse to the first relevant node
-            while not node.leaf:
-                for i, key in enumerate(node.keys):
-                    if lower_bound < key:
-                        node = node.children[i]
-                        break
-                else:
-                    node = node.children[-1]
-
-            # Collect entries in the range
-            while node:
-                for key, value in node.keys:
-                    if lower_bound <= key <= upper_bound:
-                        result.append((key, value))
-                    elif key > upper_bound:
-                        return result
-                node = node.next
-
-            return result
+            with self._lock.read_locked():
+                return self.btree.range_query(lower_bound, upper_bound)
         except Exception as e:
-            logging.error(f"Error during range search: lower_bound={lower_bound}, upper_bound={upper_bound}, error={e}")
+            logger.error("Error during range search: lower_bound=%s, upper_bound=%s, error=%s", lower_bound, upper_bound, e)
             return []
 
     def backup(self, backup_file):
         try:
             if not backup_file:
                 raise ValueError("Backup file path is invalid.")
-            backup_data(self.btree, backup_file)
+            with self._lock.read_locked():
+                backup_data(self.btree, backup_file)
             log_action("Backup successful to", backup_file)
         except Exception as e:
-            logging.error(f"Error during backup to file={backup_file}: {e}")
+            logger.error("Error during backup to file=%s: %s", backup_file, e)
 
-    def restore(self, backup_file):
+    def restore(self, backup_file, trusted=True):
         try:
             if not backup_file:
                 raise ValueError("Backup file path is invalid.")
-            restore_data(self.btree, backup_file)
+            with self._lock.write_locked():
+                restore_data(self.btree, backup_file, trusted)
             log_action("Restored data from", backup_file)
         except Exception as e:
-            logging.error(f"Error during restore from file={backup_file}: {e}")
+            logger.error("Error during restore from file=%s: %s", backup_file, e)
 
     def export_to_csv(self, file_name="database_export.csv"):
         try:
-            with open(file_name, mode='w', newline='') as file:
+            # A large buffer and writerows keep the per-row loop inside the csv module
+            with open(file_name, mode='w', newline='', buffering=1 << 20) as file:
                 writer = csv.writer(file)
                 writer.writerow(["Key", "Value"])
-                for key, value in self.btree.get_sorted_data():
-                    writer.writerow([key, value])
+                with self._lock.read_locked():
+                    writer.writerows(self.btree.iter_sorted())  # Stream rows straight from the leaves
             log_action("Exported database to CSV", file_name)
         except Exception as e:
-            logging.error(f"Error during CSV export: file={file_name}, error={e}")
+            logger.error("Error during CSV export: file=%s, error=%s", file_name, e)
 
     def print_database(self):
         try:
             print("Current Database Entries:")
-            for key, value in self.btree.get_sorted_data():
-                print(f"Key: {key}, Value: {value}")
+            with self._lock.read_locked():
+                for key, value in self.btree.iter_sorted():
+                    print(f"Key: {key}, Value: {value}")
         except Exception as e:
-            logging.error(f"Error during database print: {e}")
+            logger.error("Error during database print: %s", e)
 
     def get_tree_structure(self):
         try:
-            return self.btree.get_tree_structure()
+            with self._lock.read_locked():
+                return self.btree.get_tree_structure()
         except Exception as e:
-            logging.error(f"Error retrieving tree structure: {e}")
+            logger.error("Error retrieving tree structure: %s", e)
             return {}
 
@@ -5,9 +5,6 @@ import traceback
 from util import log_action
 from datetime import datetime
 
-# Set up logging for the main function
-logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
-
 def test_insertions(db):
     test_data = [(1, "First Entry"), (2, "Second Entry"), (3, "Third Entry")]
     for key, value in test_data:
@@ -18,20 +15,22 @@ def test_insertions(db):
             logging.error(f"Error inserting key={key}, value='{value}': {e}")
 
 def test_search(db, search_keys):
+    lines = []  # Collected so the results are written in one print call
     for key in search_keys:
         try:
             result = db.search(key)
-            print(f"Search for key={key}: {'Found: ' + str(result) if result else 'Not Found'}")
+            lines.append(f"Search for key={key}: {'Found: ' + str(result) if result else 'Not Found'}")
             logging.info(f"Search for key={key}: {'Found' if result else 'Not Found'}")
         except Exception as e:
             logging.error(f"Error searching for key={key}: {e}")
+    if lines:
+        print("\n".join(lines))
 
 def test_range_search(db, lower, upper):
     try:
         range_results = db.range_search(lower, upper)
         if range_results:
-            for key, value in range_results:
-                print(f"Found in range: key={key}, value='{value}'")
+            print("\n".join(f"Found in range: key={key}, value='{value}'" for key, value in range_results))
         else:
             print("No entries found in the specified range.")
         logging.info(f"Range search from {lower} to {upper} returned {len(range_results)} results.")
@@ -58,7 +57,7 @@ def test_backup_restore(db, backup_file):
         
         # Ensure the backup file exists before restoring
         if os.path.exists(backup_file):
-            new_db = Database(order=3)
+            new_db = Database()
             new_db.restore(backup_file)
             logging.info(f"Restored database from file: {backup_file}")
             print("\nContents of the restored database:")
@@ -80,7 +79,7 @@ def test_csv_export(db, csv_file):
 
 def main():
     try:
-        db = Database(order=3)
+        db = Database()
 
         # Testing single insertions
         print("\nTesting single insertions:")
@@ -1,7 +1,9 @@
 import itertools
-import bisect
+from bisect import bisect_left, bisect_right
 
 class Node:
+    # Fixed attribute slots: no per-instance __dict__ and faster attribute access
+    __slots__ = ('id', 'order', 'leaf', 'parent', 'keys', 'values', 'next', 'children')
     id_iter = itertools.count()
 
     def __init__(self, order, leaf=False, parent=None):
@@ -11,153 +13,76 @@ class Node:
         self.leaf = leaf  # True if it's a leaf node
         self.parent = parent  # Reference to the parent node
         self.keys = []  # Keys in the node
-        self.values = []  # Values for leaf or child pointers for internal nodes
+        self.values = []  # Values for leaf nodes
         self.next = None  # Link to the next leaf node
         self.children = [] if not leaf else None  # Child nodes for internal nodes
 
-    def is_full(self):
-        # Check if node is at max capacity
-        return len(self.keys) >= self.order
-
     def split(self):
-        # Split a full node and return the new node and middle key
-        mid_index = self.order // 2  # Dynamically calculate midpoint
-        mid_key = self.keys[mid_index]
-
-        # Create the new node with the same order and type
+        # Split an overfull node in half and return the new right node and separator
+        mid = len(self.keys) // 2
+        separator = self.keys[mid]
         new_node = Node(self.order, self.leaf, parent=self.parent)
-        new_node.keys = self.keys[mid_index + 1:]
-        new_node.values = self.values[mid_index + 1:]
-
-        # Keep only the left half in the current node
-        self.keys = self.keys[:mid_index]
-        self.values = self.values[:mid_index + 1]
-
-        if not self.leaf:
-            # Split children for internal nodes
-            new_node.children = self.children[mid_index + 1:]
-            self.children = self.children[:mid_index + 1]
 
-            # Update parent references for new children
-            for child in new_node.children:
-                child.parent = new_node
-        else:
-            # Link the new node in the leaf chain
+        # Copy the right half out once, then truncate the left half in place
+        if self.leaf:
+            # Leaves keep every entry; the first right key is copied up
+            new_node.keys = self.keys[mid:]
+            new_node.values = self.values[mid:]
+            del self.keys[mid:]
+            del self.values[mid:]
             new_node.next = self.next
             self.next = new_node
+        else:
+            # Internal nodes move the middle key up into the parent
+            new_node.keys = self.keys[mid + 1:]
+            new_node.children = self.children[mid + 1:]
+            del self.keys[mid:]
+            del self.children[mid + 1:]
+            for child in new_node.children:
+                child.parent = new_node
 
-        # Update parent references or create a new root
-        if self.parent is None:
-            new_root = Node(self.order, leaf=False) 
-            new_root.keys = [mid_key]
-            new_root.values = [self, new_node]
-            self.parent = new_root
-            new_node.parent = new_root
-            return new_node, mid_key, new_root  # Return new root for tree updates
-
-        return new_node, mid_key, None  # No new root needed if not splitting root
+        return new_node, separator
 
     def insert_in_leaf(self, key, value):
-        # Insert a key-value pair in a sorted way for leaf nodes
-        idx = bisect.bisect_left(self.keys, key)
+        # Insert a key-value pair in a sorted way; return False if an existing key was overwritten
+        idx = bisect_left(self.keys, key)
+        if idx < len(self.keys) and self.keys[idx] == key:
+            self.values[idx] = value
+            return False
         self.keys.insert(idx, key)
         self.values.insert(idx, value)
+        return True
 
-    def insert_in_internal(self, key, right_child):
-        # Insert a key and right child pointer in an internal node
-        idx = bisect.bisect_left(self.keys, key)
-        self.keys.insert(idx, key)
-        self.values.insert(idx + 1, right_child)
-
-    def remove_key(self, key):
-        # Remove a key and its corresponding value or child pointer
-        if key in self.keys:
-            index = self.keys.index(key)
-            self.keys.pop(index)
-            self.values.pop(index)
-        else:
-            raise KeyError(f"Key {key} not found in node {self.id}.")
-        
-        # Rebalance the tree if the node underflows
-        if not self.leaf and len(self.keys) < self.order // 2:
-            self.rebalance()
-
-    def rebalance(self):
-        # Handle rebalancing when a node underflows
-        if len(self.keys) < self.order // 2 and self.parent:
-            parent = self.parent
-            idx = parent.values.index(self)
-
-            # Borrow from a sibling or merge if needed
-            if idx > 0 and len(parent.values[idx - 1].keys) > self.order // 2:
-                self.borrow_from_sibling(parent.values[idx - 1], parent.keys[idx - 1], is_left_sibling=True)
-            elif idx < len(parent.values) - 1 and len(parent.values[idx + 1].keys) > self.order // 2:
-                self.borrow_from_sibling(parent.values[idx + 1], parent.keys[idx], is_left_sibling=False)
-            else:
-                sibling = parent.values[idx - 1] if idx > 0 else parent.values[idx + 1]
-                parent_key = parent.keys[idx - 1] if idx > 0 else parent.keys[idx]
-                self.merge(sibling, parent_key)
-                parent.remove_key(parent_key)
-
-    def borrow_from_sibling(self, sibling, parent_key, is_left_sibling):
-        # Borrow a key from a sibling
-        if is_left_sibling:
-            self.keys.insert(0, parent_key)
-            self.values.insert(0, sibling.values.pop(-1))
-            sibling_key = sibling.keys.pop(-1)
-        else:
-            self.keys.append(parent_key)
-            self.values.append(sibling.values.pop(0))
-            sibling_key = sibling.keys.pop(0)
-
-        # Update the parent's key
-        sibling.parent.keys[sibling.parent.keys.index(parent_key)] = sibling_key
-
-    def merge(self, sibling, parent_key):
-        # Merge this node with a sibling node
-        if self.leaf:
-            # Merge leaves
-            self.keys.extend(sibling.keys)
-            self.values.extend(sibling.values)
-            self.next = sibling.next  # Update leaf link
-        else:
-            # Merge internal nodes with the parent key
-            self.keys.append(parent_key)
-            self.keys.extend(sibling.keys)
-            self.values.extend(sibling.values)
-            for child in sibling.children:
-                child.parent = self
+    def find_leaf(self, key):
+        # Descend from this node to the leaf responsible for key
+        node = self
+        while not node.leaf:
+            # Separators are copies of the first key of the right subtree
+            node = node.children[bisect_right(node.keys, key)]
+        return node
 
     def search(self, key):
-        # Search for a key in the node and return its value or pointer
-        if self.leaf:
-            idx = bisect.bisect_left(self.keys, key)
-            if idx < len(self.keys) and self.keys[idx] == key:
-                return self.values[idx]
-            return None
-        else:
-            for i, k in enumerate(self.keys):
-                if key < k:
-                    return self.children[i].search(key)
-            return self.children[-1].search(key)
+        # Search for a key below this node and return its value
+        leaf = self.find_leaf(key)
+        idx = bisect_left(leaf.keys, key)
+        if idx < len(leaf.keys) and leaf.keys[idx] == key:
+            return leaf.values[idx]
+        return None
 
     def range_query(self, start_key, end_key):
         # Return all key-value pairs within the range [start_key, end_key]
         result = []
-        if self.leaf:
-            current = self
-            while current:
-                for k, v in zip(current.keys, current.values):
-                    if start_key <= k <= end_key:
-                        result.append((k, v))
-                current = current.next  # Traverse leaf links
-            return result
-        else:
-            for i, k in enumerate(self.keys):
-                if start_key < k:
-                    result.extend(self.children[i].range_query(start_key, end_key))
-            result.extend(self.children[-1].range_query(start_key, end_key))
-            return result
+        current = self.find_leaf(start_key)
+        idx = bisect_left(current.keys, start_key)  # Skip keys below the range once
+        while current:
+            keys = current.keys
+            stop = bisect_right(keys, end_key)  # Find the end of the range in this leaf in C
+            result.extend(zip(keys[idx:stop], current.values[idx:stop]))
+            if stop < len(keys):
+                return result  # Keys are sorted along the chain, so stop here
+            current = current.next  # Traverse leaf links
+            idx = 0
+        return result
 
     def __repr__(self):
         # Return a concise string representation of the node
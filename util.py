@@ -1,13 +1,21 @@
 import logging
 import os
 import csv
+import gzip
+import io
+import itertools
+import re
+import threading
+from contextlib import contextmanager
+from logging.handlers import MemoryHandler
 
-# Set up logging
-logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s", filename='app.log', filemode='a')
+# Set up logging once for the whole package; records are buffered and errors flush at once
+if not logging.getLogger().hasHandlers():
+    _file_handler = logging.FileHandler('app.log', mode='a', delay=True)
+    _file_handler.setFormatter(logging.Formatter("%(asctime)s [%(levelname)s] %(message)s"))
+    logging.basicConfig(level=logging.INFO, handlers=[MemoryHandler(1024, flushLevel=logging.ERROR, target=_file_handler)])
 
-def compare_keys(key1, key2):
-    # Compare two keys and return a value indicating their relative order
-    return (key1 > key2) - (key1 < key2)
+_NEEDS_QUOTING = re.compile(r'[,"\r\n]')  # Characters that force csv quoting
 
 def validate_entry(key, value):
     # Validate that key and value are in correct format
@@ -17,59 +25,151 @@ def validate_entry(key, value):
         return False, "Value must be a string."
     return True, "Valid entry."
 
+_root_logger = logging.getLogger()  # Looked up once instead of on every log_action call
+
 def log_action(action, *args):
     # Log actions performed in the database or B+ Tree
+    if not _root_logger.isEnabledFor(logging.INFO):
+        return  # Skip building a message nobody will see
     message = f"{action}: " + ", ".join(str(arg) for arg in args)
-    logging.info(message)
-
-def get_sorted_data(btree):
-    # Return sorted data in the form of a list of tuples from the B+ Tree
-    if btree.root is None:
-        log_action("Tree is empty, no data to sort")
-        return []
-    data = []
-    node = btree.root
-    while node:
-        for i in range(len(node.keys)):
-            data.append((node.keys[i], node.values[i]))
-        node = node.next  # Traverse through leaf nodes
-    return sorted(data)
-
-def backup_data(btree, backup_file):
+    _root_logger.info(message)
+
+class ReadWriteLock:
+    # Allow any number of concurrent readers or a single writer; waiting writers go first
+    def __init__(self):
+        self._cond = threading.Condition(threading.Lock())
+        self._readers = 0
+        self._writer = False
+        self._writers_waiting = 0  # New readers hold back while a writer is queued
+
+    @contextmanager
+    def read_locked(self):
+        with self._cond:
+            while self._writer or self._writers_waiting:
+                self._cond.wait()
+            self._readers += 1
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._readers -= 1
+                if not self._readers:
+                    self._cond.notify_all()
+
+    @contextmanager
+    def write_locked(self):
+        with self._cond:
+            self._writers_waiting += 1
+            try:
+                while self._writer or self._readers:
+                    self._cond.wait()
+            finally:
+                self._writers_waiting -= 1
+            self._writer = True
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._writer = False
+                self._cond.notify_all()
+
+RESTORE_CHECK_ROWS = 100  # Leading rows shape-checked in a trusted restore
+
+_ensured_dirs = set()  # Backup directories already created by this process
+
+def open_backup(backup_file, mode):
+    # Open a backup file for text I/O; a .gz suffix selects fast gzip compression
+    if backup_file.endswith(".gz"):
+        return gzip.open(backup_file, mode + 't', compresslevel=1, newline='')
+    return open(backup_file, mode, newline='', buffering=1 << 20)
+
+def format_row(key, value):
+    # Format one backup row; plain values skip the csv quoting machinery
+    if _NEEDS_QUOTING.search(value) is None:
+        return f"{key},{value}\r\n"
+    buffer = io.StringIO()
+    csv.writer(buffer).writerow([key, value])
+    return buffer.getvalue()
+
+def read_rows(file):
+    # Return the data rows of a backup; files without quotes are split directly
+    text = file.read()
+    if '"' in text:
+        rows = csv.reader(io.StringIO(text, newline=''))
+        next(rows, None)  # Skip header row
+        return rows
+    # No quoted fields means no separators inside values
+    lines = text.split("\n")[1:]
+    return (line.rstrip("\r").split(",", 1) for line in lines if line)
+
+def backup_data(btree, backup_file, fast_csv=True):
     # Backup the B+ Tree data into a file
     try:
         backup_dir = os.path.dirname(backup_file)
-        if not os.path.exists(backup_dir) and backup_dir:
-            os.makedirs(backup_dir)
+        if backup_dir and backup_dir not in _ensured_dirs:
+            os.makedirs(backup_dir, exist_ok=True)
+            _ensured_dirs.add(backup_dir)
 
-        with open(backup_file, 'w', newline='') as file:
-            writer = csv.writer(file)
-            writer.writerow(["Key", "Value"])
-            for key, value in get_sorted_data(btree):
-                writer.writerow([key, value])
+        try:
+            file = open_backup(backup_file, 'w')
+        except FileNotFoundError:
+            if not backup_dir:
+                raise
+            # The cached directory was removed since the last backup; recreate it once
+            _ensured_dirs.discard(backup_dir)
+            os.makedirs(backup_dir, exist_ok=True)
+            _ensured_dirs.add(backup_dir)
+            file = open_backup(backup_file, 'w')
+
+        with file:
+            if fast_csv:
+                # Plain values are formatted directly; only values that need quoting use csv
+                file.write("Key,Value\r\n")
+                file.writelines(format_row(key, value) for key, value in btree.iter_sorted())
+            else:
+                writer = csv.writer(file)
+                writer.writerow(["Key", "Value"])
+                writer.writerows(btree.iter_sorted())
 
         log_action("Backup successful", backup_file)
     except Exception as e:
         log_action("Backup failed", e)
+        raise  # Let the caller report the failure instead of logging success
 
-def restore_data(btree, backup_file):
+def restore_data(btree, backup_file, trusted=True):
     # Restore the B+ Tree data from a backup file
+    # Trusted backups only have their first rows shape-checked; untrusted ones check and skip per row
     try:
         if not os.path.exists(backup_file):
             raise FileNotFoundError(f"Backup file {backup_file} not found.")
 
-        btree.clear()  # Ensure the tree is empty before restoring
+        entries = {}
+        with open_backup(backup_file, 'r') as file:
+            reader = read_rows(file)
+            if trusted:
+                head = list(itertools.islice(reader, RESTORE_CHECK_ROWS))
+                malformed = [row for row in head if len(row) != 2]
+                if malformed:
+                    log_action("Malformed rows in trusted backup", backup_file, malformed[0])
+                    raise ValueError(f"Backup {backup_file} does not have two columns per row.")
+                entries.update((int(key), value) for key, value in head)
+                entries.update((int(key), value) for key, value in reader)
+            else:
+                for row in reader:
+                    if len(row) != 2:
+                        log_action("Invalid entry in restore", row)
+                        continue
+                    try:
+                        key = int(row[0])
+                    except ValueError:
+                        log_action("Invalid key in restore", row)
+                        continue
+                    entries[key] = row[1]
 
-        with open(backup_file, 'r', newline='') as file:
-            reader = csv.reader(file)
-            next(reader)  # Skip header row
-            for row in reader:
-                key, value = int(row[0]), row[1]
-                is_valid, message = validate_entry(key, value)
-                if is_valid:
-                    btree.insert(key, value)  # Assuming insert method in B+ Tree
-                else:
-                    log_action("Invalid entry in restore", key, value, message)
+        # Backups are written in key order, so sorting is a linear pass
+        btree.clear()  # Ensure the tree is empty before restoring
+        btree.bulk_load(sorted(entries.items()))
         log_action("Restore successful", backup_file)
     except Exception as e:
         log_action("Restore failed", e)
+        raise  # Let the caller report the failure instead of logging success